@@ -1,19 +1,18 @@
 """Evaluation module for classifier metrics."""
 
+import functools
+import itertools
 import logging
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Sequence
+from typing import Dict
 
 import numpy as np
-import pandas as pd
-from sklearn.metrics import (
-    accuracy_score,
-    classification_report,
-    confusion_matrix,
-)
 
 from .features import compute_features
-from .heuristics import ClassificationResult, ItemType, classify
+from .heuristics import ITEM_TYPES, ItemType, ItemTypeEnum, classify_batch, feature_row
 from .ocr import run_ocr
 
 logger = logging.getLogger(__name__)
@@ -21,13 +20,34 @@ logger = logging.getLogger(__name__)
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
+PROJECT_ROOT = Path(__file__).parent.parent
 
-def evaluate_dataset(threshold: float = 5.0) -> Dict:
+# Default number of concurrent OCR threads for evaluate_dataset
+OCR_WORKERS = 4
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_image_path(image_path_str: str) -> Path:
+    """Resolve a labels-file image path (absolute, or relative to the project root)."""
+    image_path = Path(image_path_str)
+    if not image_path.is_absolute():
+        image_path = PROJECT_ROOT / image_path
+    return image_path
+
+
+def evaluate_dataset(threshold: float = 5.0, max_workers: int = OCR_WORKERS) -> Dict:
     """
     Load labelled dataset, run classifier, return metrics.
 
+    OCR for the next few images is prefetched on a thread pool (tesseract runs
+    as a subprocess, so threads overlap freely) while the main thread computes
+    features, so total time approaches the OCR time alone. At most
+    2 * max_workers OCR jobs are in flight, which bounds memory use.
+
     Args:
         threshold: Classification threshold (default: 5.0)
+        max_workers: Number of OCR threads (default: 4; tesseract is itself
+            multithreaded, so more mostly oversubscribes the CPU)
 
     Returns:
         Dictionary with:
@@ -37,8 +57,12 @@ def evaluate_dataset(threshold: float = 5.0) -> Dict:
         - overall_accuracy: float
         - classification_report: str
     """
+    # Imported here: pandas and sklearn are slow to import and only needed for evaluation
+    import pandas as pd
+    from sklearn.metrics import classification_report
+
     # Load labels CSV
-    labels_file = Path(__file__).parent.parent / "data" / "labelled" / "labels.csv"
+    labels_file = PROJECT_ROOT / "data" / "labelled" / "labels.csv"
     labels_file.parent.mkdir(parents=True, exist_ok=True)
 
     if not labels_file.exists():
@@ -75,50 +99,64 @@ def evaluate_dataset(threshold: float = 5.0) -> Dict:
             "classification_report": "No valid data in labels file",
         }
 
-    # Process each image
-    true_labels: list[ItemType] = []
-    predicted_labels: list[ItemType] = []
-
-    for _, row in df.iterrows():
-        image_path_str = str(row["image_path"])
-        true_label_str = str(row["true_label"]).lower().strip()
-
-        # Validate true label
-        if true_label_str not in ["recipe", "workout", "quote", "none"]:
-            logger.warning(f"Invalid label '{true_label_str}' for {image_path_str}, skipping")
-            continue
-
-        true_label: ItemType = true_label_str  # type: ignore
-
-        # Resolve image path (could be relative or absolute)
-        image_path = Path(image_path_str)
-        if not image_path.is_absolute():
-            # Try relative to project root
-            project_root = Path(__file__).parent.parent
-            image_path = project_root / image_path
-
-        if not image_path.exists():
-            logger.warning(f"Image not found: {image_path}, skipping")
-            continue
-
-        try:
-            # Run OCR
-            ocr_result = run_ocr(image_path)
-
-            # Compute features
-            features = compute_features(ocr_result)
-
-            # Classify
-            result: ClassificationResult = classify(features, threshold=threshold)
-
-            true_labels.append(true_label)
-            predicted_labels.append(result.item_type)
-
-        except Exception as e:
-            logger.error(f"Error processing {image_path}: {e}")
-            continue
-
-    if not true_labels:
+    # Normalize and validate labels as whole columns, then drop invalid rows
+    df["image_path"] = df["image_path"].map(str)
+    df["true_label"] = df["true_label"].astype(str).str.lower().str.strip()
+    valid_label = df["true_label"].isin(ITEM_TYPES)
+    for image_path_str, true_label_str in zip(
+        df.loc[~valid_label, "image_path"], df.loc[~valid_label, "true_label"]
+    ):
+        logger.warning(f"Invalid label '{true_label_str}' for {image_path_str}, skipping")
+    df = df[valid_label].copy()
+
+    # Resolve image paths (could be relative or absolute) and drop missing images
+    df["abs_path"] = df["image_path"].map(_resolve_image_path)
+    image_exists = df["abs_path"].map(Path.exists).astype(bool)
+    for image_path in df.loc[~image_exists, "abs_path"]:
+        logger.warning(f"Image not found: {image_path}, skipping")
+    df = df[image_exists]
+
+    # Collect the (image, label) jobs from the clean rows
+    image_paths: list[Path] = []
+    job_labels: list[ItemType] = []
+
+    for row in df.itertuples(index=False):
+        image_paths.append(row.abs_path)
+        job_labels.append(row.true_label)
+
+    # Extract features for each image while later OCR jobs run in the background
+    true_ids = array("B")
+    feature_rows: list[Dict] = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Bounded prefetch window: submit one new OCR job per result consumed,
+        # so finished OcrResults are dropped as soon as their features exist
+        jobs = zip(image_paths, job_labels)
+        in_flight: deque = deque(
+            (image_path, true_label, executor.submit(run_ocr, image_path))
+            for image_path, true_label in itertools.islice(jobs, 2 * max_workers)
+        )
+
+        while in_flight:
+            image_path, true_label, ocr_future = in_flight.popleft()
+            for next_path, next_label in itertools.islice(jobs, 1):
+                in_flight.append((next_path, next_label, executor.submit(run_ocr, next_path)))
+
+            try:
+                # Wait for OCR
+                ocr_result = ocr_future.result()
+
+                # Compute features
+                features = compute_features(ocr_result)
+
+                true_ids.append(ItemTypeEnum[true_label.upper()])
+                feature_rows.append(feature_row(features))
+
+            except Exception as e:
+                logger.error(f"Error processing {image_path}: {e}")
+                continue
+
+    if not true_ids:
         return {
             "confusion_matrix": np.zeros((4, 4), dtype=int),
             "per_class_precision": {},
@@ -127,31 +165,28 @@ def evaluate_dataset(threshold: float = 5.0) -> Dict:
             "classification_report": "No valid images processed",
         }
 
-    # Compute metrics
-    label_order = ["recipe", "workout", "quote", "none"]
-    cm = confusion_matrix(
-        true_labels,
-        predicted_labels,
-        labels=label_order,  # type: ignore
-    )
+    # Classify all images in one vectorized pass; labels are ItemTypeEnum ids from here on
+    true_ids = np.frombuffer(true_ids, dtype=np.uint8)
+    pred_ids = classify_batch(pd.DataFrame(feature_rows), threshold=threshold)
 
-    # Calculate precision and recall per class
-    report = classification_report(
-        true_labels,
-        predicted_labels,
-        labels=label_order,  # type: ignore
-        output_dict=True,
-        zero_division=0,
+    # Compute metrics
+    cm = np.zeros((len(ITEM_TYPES), len(ITEM_TYPES)), dtype=int)
+    np.add.at(cm, (true_ids, pred_ids), 1)
+
+    # Precision and recall per class, straight from the confusion matrix
+    # (0.0 where a class has no predicted/true samples)
+    true_positives = np.diag(cm)
+    predicted_counts = cm.sum(axis=0)
+    true_counts = cm.sum(axis=1)
+    precision = np.divide(
+        true_positives, predicted_counts, out=np.zeros(len(cm)), where=predicted_counts > 0
     )
+    recall = np.divide(true_positives, true_counts, out=np.zeros(len(cm)), where=true_counts > 0)
 
-    per_class_precision = {
-        label: report[label]["precision"] for label in label_order if label in report
-    }
-    per_class_recall = {
-        label: report[label]["recall"] for label in label_order if label in report
-    }
+    per_class_precision = dict(zip(ITEM_TYPES, precision.tolist()))
+    per_class_recall = dict(zip(ITEM_TYPES, recall.tolist()))
 
-    overall_accuracy = accuracy_score(true_labels, predicted_labels)
+    overall_accuracy = float(cm.trace() / cm.sum())
 
     return {
         "confusion_matrix": cm,
@@ -159,11 +194,12 @@ def evaluate_dataset(threshold: float = 5.0) -> Dict:
         "per_class_recall": per_class_recall,
         "overall_accuracy": overall_accuracy,
         "classification_report": classification_report(
-            true_labels,
-            predicted_labels,
-            labels=label_order,  # type: ignore
+            true_ids,
+            pred_ids,
+            labels=list(ItemTypeEnum),
+            target_names=ITEM_TYPES,
         ),
-        "num_samples": len(true_labels),
+        "num_samples": len(true_ids),
     }
 
 
@@ -172,4 +208,3 @@ if __name__ == "__main__":
 
     results = evaluate_dataset(threshold=5.0)
     pprint(results)
-
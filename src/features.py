@@ -1,36 +1,131 @@
 """Feature extraction from OCR results."""
 
+import functools
 import logging
 import re
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+import ahocorasick
 
 from .ocr import OcrResult
 
 logger = logging.getLogger(__name__)
 
-# Vocabulary lists
-MEASURE_UNITS = ["g", "kg", "ml", "l", "tbsp", "tsp", "cup", "cups", "oz", "°c", "°f"]
-COOKING_VERBS = [
-    "preheat",
-    "mix",
-    "stir",
-    "bake",
-    "boil",
-    "simmer",
-    "chop",
-    "fry",
-    "whisk",
-    "serve",
-]
-INGREDIENT_SECTION_TERMS = ["ingredients", "serves", "makes", "yield"]
-STEP_TERMS = ["instructions", "method", "directions", "steps"]
-WORKOUT_TERMS = ["sets", "reps", "rest", "warm-up", "cooldown", "amrap", "emom", "rounds"]
-WORKOUT_BODY_PARTS = ["legs", "chest", "back", "shoulders", "glutes", "core", "abs"]
-QUOTE_MARKERS = ["—", "-", """, """, '"']
-
-
-@dataclass
+# Vocabularies
+MEASURE_UNITS = frozenset({"g", "kg", "ml", "l", "tbsp", "tsp", "cup", "cups", "oz", "°c", "°f"})
+COOKING_VERBS = frozenset(
+    {
+        "preheat",
+        "mix",
+        "stir",
+        "bake",
+        "boil",
+        "simmer",
+        "chop",
+        "fry",
+        "whisk",
+        "serve",
+    }
+)
+INGREDIENT_SECTION_TERMS = frozenset({"ingredients", "serves", "makes", "yield"})
+STEP_TERMS = frozenset({"instructions", "method", "directions", "steps"})
+WORKOUT_TERMS = frozenset(
+    {"sets", "reps", "rest", "warm-up", "cooldown", "amrap", "emom", "rounds"}
+)
+WORKOUT_BODY_PARTS = frozenset({"legs", "chest", "back", "shoulders", "glutes", "core", "abs"})
+QUOTE_MARKERS = ["—", "-", "\u201c", "\u201d", '"']
+# Quote markers are single characters, so presence is a set intersection
+QUOTE_MARKER_CHARS = frozenset(QUOTE_MARKERS)
+
+# Word tokens used for vocabulary lookups ("350°F" -> "°f", "2 cups" -> "cups")
+_TOKEN_RE = re.compile(r"[a-z°]+")
+
+# Inflection suffixes stripped before vocabulary lookups, longest first
+_INFLECTION_SUFFIXES = ("ing", "ied", "ies", "ed", "es", "s")
+
+# Vocabularies counted by whole-token lookup, keyed by category
+_TOKEN_VOCABULARIES = {
+    "units": MEASURE_UNITS,
+    "cooking_verbs": COOKING_VERBS,
+    "workout_terms": WORKOUT_TERMS,
+    "body_parts": WORKOUT_BODY_PARTS,
+}
+
+# Every whole-token vocabulary term
+_TOKEN_TERMS = frozenset().union(*_TOKEN_VOCABULARIES.values())
+
+# Terms matched as substrings by the shared Aho-Corasick automaton: the section
+# headings, plus any token-vocabulary term spanning several tokens (e.g. "warm-up")
+_SUBSTRING_VOCABULARIES = {
+    "ingredient_sections": INGREDIENT_SECTION_TERMS,
+    "step_sections": STEP_TERMS,
+    **{
+        category: frozenset(term for term in terms if not _TOKEN_RE.fullmatch(term))
+        for category, terms in _TOKEN_VOCABULARIES.items()
+    },
+}
+
+
+@functools.lru_cache(maxsize=16384)
+def _base_forms(token: str) -> FrozenSet[str]:
+    """
+    Candidate base forms of an inflected token, plus the token itself.
+
+    A light suffix stripper, enough to map recipe and workout text onto the
+    vocabularies: "chopped" -> "chop", "baked" -> "bake", "stirring" -> "stir",
+    "fried" -> "fry", "serves" -> "serve". Tokens that are already vocabulary
+    words are left alone, so "cups" isn't counted a second time as "cup".
+    """
+    if token in _TOKEN_TERMS:
+        return frozenset((token,))
+
+    forms = {token}
+    for suffix in _INFLECTION_SUFFIXES:
+        if not token.endswith(suffix):
+            continue
+        base = token[: -len(suffix)]
+        # Keep stems of 2+ letters so "led" or "gs" can't become a unit
+        if len(base) < 2:
+            continue
+        if suffix in ("ied", "ies"):
+            forms.add(base + "y")
+            continue
+        forms.add(base)
+        forms.add(base + "e")  # bak(ed) -> bake
+        if base[-1] == base[-2]:
+            forms.add(base[:-1])  # chopp(ed) -> chop
+    return frozenset(forms)
+
+
+def _build_vocabulary_automaton() -> ahocorasick.Automaton:
+    """
+    Build one automaton matching every substring term in a single pass.
+
+    Each key maps to a list of (category, term) payloads so a term shared
+    between vocabularies is tallied in all of them.
+    """
+    payloads: Dict[str, List[Tuple[str, str]]] = {}
+    for category, terms in _SUBSTRING_VOCABULARIES.items():
+        for term in terms:
+            payloads.setdefault(term.lower(), []).append((category, term))
+
+    automaton = ahocorasick.Automaton()
+    for key, value in payloads.items():
+        automaton.add_word(key, value)
+    automaton.make_automaton()
+    return automaton
+
+
+_VOCABULARY_AUTOMATON = _build_vocabulary_automaton()
+
+# Bullet (•, -, *, +) or numbered ("1.", "2)") list item; group 1 is set for bullets
+_BULLET_OR_NUMBER = re.compile(r"^\s*(?:([•\-\*\+])|\d+[\.\)])\s+")
+# Quote attribution: line starting with "— " or "- " followed by 2+ words
+_QUOTE_AUTHOR_PATTERN = re.compile(r"^\s*[—\-]\s+\w+\s+\w+")
+
+
+@dataclass(slots=True, frozen=True)
 class LayoutFeatures:
     """Layout-based features extracted from OCR lines."""
 
@@ -40,7 +135,7 @@ class LayoutFeatures:
     avg_line_length: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Features:
     """Complete feature set for classification."""
 
@@ -54,85 +149,123 @@ class Features:
     has_steps_section: bool
     has_quote_author_pattern: bool
     quote_mark_count: int
+    # Lowercased OCR lines, shared with the scorers so lines are lowercased once
+    lines_lower: Optional[List[str]] = field(default=None, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        if self.lines_lower is None:
+            object.__setattr__(self, "lines_lower", [line.lower() for line in self.ocr.lines])
 
-def compute_layout_features(ocr: OcrResult) -> LayoutFeatures:
+
+def _scan_lines(lines: List[str]) -> Tuple[LayoutFeatures, bool, List[str]]:
     """
-    Compute layout features from OCR lines.
+    Walk the OCR lines once, collecting every line-level signal.
 
     Args:
-        ocr: OcrResult containing lines
+        lines: OCR lines
 
     Returns:
-        LayoutFeatures with counts and averages
+        Tuple of (layout features, has_quote_author_pattern, lowercased lines)
     """
-    lines = ocr.lines
     line_count = len(lines)
-
-    # Count bullet points (lines starting with •, -, *, etc.)
-    bullet_pattern = re.compile(r"^[\s]*[•\-\*\+]\s+")
-    bullet_lines = sum(1 for line in lines if bullet_pattern.match(line))
-
-    # Count numbered lines (lines starting with numbers like "1.", "2)", etc.)
-    numbered_pattern = re.compile(r"^[\s]*\d+[\.\)]\s+")
-    numbered_lines = sum(1 for line in lines if numbered_pattern.match(line))
+    bullet_lines = 0
+    numbered_lines = 0
+    total_length = 0
+    has_quote_author_pattern = False
+    lines_lower = []
+
+    for line in lines:
+        lines_lower.append(line.lower())
+        total_length += len(line)
+
+        match = _BULLET_OR_NUMBER.match(line)
+        if match is not None:
+            if match.group(1):
+                bullet_lines += 1
+            else:
+                numbered_lines += 1
+
+        if not has_quote_author_pattern and _QUOTE_AUTHOR_PATTERN.match(line):
+            has_quote_author_pattern = True
 
     # Average line length
-    avg_line_length = sum(len(line) for line in lines) / line_count if line_count > 0 else 0.0
+    avg_line_length = total_length / line_count if line_count > 0 else 0.0
 
-    return LayoutFeatures(
+    layout = LayoutFeatures(
         line_count=line_count,
         bullet_lines=bullet_lines,
         numbered_lines=numbered_lines,
         avg_line_length=avg_line_length,
     )
+    return layout, has_quote_author_pattern, lines_lower
 
 
-def compute_features(ocr: OcrResult) -> Features:
+def compute_layout_features(ocr: OcrResult) -> LayoutFeatures:
     """
-    Compute all features from OCR result.
+    Compute layout features from OCR lines.
 
     Args:
-        ocr: OcrResult from OCR processing
+        ocr: OcrResult containing lines
 
     Returns:
-        Features object with all extracted features
+        LayoutFeatures with counts and averages
     """
-    layout = compute_layout_features(ocr)
-    text_lower = ocr.full_text.lower()
+    layout, _, _ = _scan_lines(ocr.lines)
+    return layout
 
-    # Count units (check if any unit appears in the text)
-    num_units = sum(1 for unit in MEASURE_UNITS if unit.lower() in text_lower)
 
-    # Count cooking verbs (check if verb appears in any line)
-    num_cooking_verbs = sum(
-        1 for verb in COOKING_VERBS if any(verb.lower() in line.lower() for line in ocr.lines)
-    )
+def compute_features(ocr: OcrResult) -> Features:
+    """
+    Compute all features from OCR result.
 
-    # Count workout terms
-    num_workout_terms = sum(
-        1 for term in WORKOUT_TERMS if any(term.lower() in line.lower() for line in ocr.lines)
-    )
+    Results are memoized on the OCR text, so repeated evaluation runs (e.g.
+    threshold sweeps) over the same OCR output skip feature extraction.
+    The returned Features may be shared between calls and must not be mutated.
 
-    # Count body parts
-    num_body_parts = sum(
-        1 for part in WORKOUT_BODY_PARTS if any(part.lower() in line.lower() for line in ocr.lines)
-    )
+    Args:
+        ocr: OcrResult from OCR processing
 
-    # Check for ingredients section
-    has_ingredients_section = any(
-        term.lower() in text_lower for term in INGREDIENT_SECTION_TERMS
-    )
+    Returns:
+        Features object with all extracted features
+    """
+    return _compute_features_cached(ocr.full_text, tuple(ocr.lines))
 
-    # Check for steps section
-    has_steps_section = any(term.lower() in text_lower for term in STEP_TERMS)
 
-    # Check for quote author pattern (line starting with "— " or "- " followed by 2+ words)
-    quote_author_pattern = re.compile(r"^[\s]*[—\-]\s+\w+\s+\w+")
-    has_quote_author_pattern = any(quote_author_pattern.match(line) for line in ocr.lines)
+@functools.lru_cache(maxsize=4096)
+def _compute_features_cached(full_text: str, lines: Tuple[str, ...]) -> Features:
+    """Compute features from hashable OCR text; see compute_features."""
+    ocr = OcrResult(full_text=full_text, lines=list(lines))
+    layout, has_quote_author_pattern, lines_lower = _scan_lines(ocr.lines)
+    text_lower = ocr.full_text.lower()
+
+    # Tally distinct substring terms in one pass over the text. Lines are
+    # stripped slices of full_text, so a term appearing in any line is exactly
+    # a term appearing in full_text.
+    matched: Dict[str, Set[str]] = {category: set() for category in _SUBSTRING_VOCABULARIES}
+    for _, hits in _VOCABULARY_AUTOMATON.iter(text_lower):
+        for category, term in hits:
+            matched[category].add(term)
+
+    # Count distinct vocabulary words; whole tokens avoid substring false
+    # positives such as "back" in "background" or "g" in "great", and base
+    # forms keep inflections such as "chopped" or "serves" matching
+    tokens = set()
+    for token in set(_TOKEN_RE.findall(text_lower)):
+        tokens |= _base_forms(token)
+    term_counts = {
+        category: len(terms & tokens) + len(matched[category])
+        for category, terms in _TOKEN_VOCABULARIES.items()
+    }
+
+    num_units = term_counts["units"]
+    num_cooking_verbs = term_counts["cooking_verbs"]
+    num_workout_terms = term_counts["workout_terms"]
+    num_body_parts = term_counts["body_parts"]
+    has_ingredients_section = bool(matched["ingredient_sections"])
+    has_steps_section = bool(matched["step_sections"])
 
     # Count quote markers
-    quote_mark_count = sum(1 for marker in QUOTE_MARKERS if marker in ocr.full_text)
+    quote_mark_count = len(QUOTE_MARKER_CHARS.intersection(ocr.full_text))
 
     return Features(
         ocr=ocr,
@@ -145,5 +278,6 @@ def compute_features(ocr: OcrResult) -> Features:
         has_steps_section=has_steps_section,
         has_quote_author_pattern=has_quote_author_pattern,
         quote_mark_count=quote_mark_count,
+        lines_lower=lines_lower,
     )
 
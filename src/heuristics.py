@@ -3,16 +3,90 @@
 import logging
 import re
 from dataclasses import dataclass
-from typing import Dict, Literal
+from enum import IntEnum
+from typing import Dict, Literal, Tuple
 
-from .features import Features, QUOTE_MARKERS
+import numpy as np
+
+from .features import Features, QUOTE_MARKER_CHARS
 
 logger = logging.getLogger(__name__)
 
 ItemType = Literal["recipe", "workout", "quote", "none"]
 
 
-@dataclass
+class ItemTypeEnum(IntEnum):
+    """Integer ids for item types, used internally for batch results and metrics."""
+
+    RECIPE = 0
+    WORKOUT = 1
+    QUOTE = 2
+    NONE = 3
+
+
+# Item type names, indexed by ItemTypeEnum
+ITEM_TYPES: Tuple[ItemType, ...] = ("recipe", "workout", "quote", "none")
+
+# "serves 4" / "makes 12"
+_SERVES_PATTERN = re.compile(r"(serves|makes)\s+\d+", re.IGNORECASE)
+# Set/rep notation such as 3x10 or 3 × 10
+_WORKOUT_PATTERN = re.compile(r"\d+\s*[x×]\s*\d+", re.IGNORECASE)
+
+# Scored types, in score-column order for score_batch (ids match ItemTypeEnum)
+SCORED_TYPES = ITEM_TYPES[:3]
+
+# Scoring rules as (condition, recipe, workout, quote) weights. Rule i is bit i
+# of predicate_bits(), so a sample's scores are the summed weights of its set bits.
+# Adding or reordering a rule means updating predicate_bits() to match;
+# test_predicate_bits_match_rules checks the two line up.
+_RULES = (
+    ("any INGREDIENT_SECTION_TERMS appears", 3.0, -2.0, 0.0),
+    ("num_units >= 3", 2.0, 0.0, 0.0),
+    ("num_cooking_verbs >= 2", 2.0, 0.0, 0.0),
+    ("bullet_lines >= 3", 1.0, 0.0, 0.0),
+    ("numbered_lines >= 2", 1.0, 0.0, 0.0),
+    ('any line matches "serves X" or "makes X"', 1.0, 0.0, 0.0),
+    ('"sets" or "reps" appears in multiple lines', 0.0, 3.0, 0.0),
+    ("a pattern like 3x10 / 3 x 10 occurs", 0.0, 2.0, 0.0),
+    ("num_workout_terms >= 2", 0.0, 2.0, 0.0),
+    ("any WORKOUT_BODY_PARTS appears", 0.0, 1.0, 0.0),
+    ("bullet/numbered lines suggesting a list", 0.0, 1.0, 0.0),
+    ("any line contains quote marks and 4+ words", 0.0, 0.0, 2.0),
+    ("has_quote_author_pattern", 0.0, 0.0, 3.0),
+    ("1 <= line_count <= 6", 0.0, 0.0, 1.0),
+    ("avg_line_length >= 40 (prose)", 0.0, 0.0, 1.0),
+    ("num_units == 0 and num_workout_terms == 0", 0.0, 0.0, 1.0),
+)
+
+# (num_rules, 3) weight matrix for batch scoring
+_RULE_WEIGHTS = np.array([rule[1:] for rule in _RULES])
+
+
+def _unpack_bits(bits: np.ndarray, num_bits: int) -> np.ndarray:
+    """Expand integer bitmaps into an (N, num_bits) 0/1 matrix, lowest bit first."""
+    return (np.asarray(bits, dtype=np.int64)[:, None] >> np.arange(num_bits)) & 1
+
+
+def _byte_score_table(first_bit: int) -> Tuple[Tuple[float, float, float], ...]:
+    """
+    Summed (recipe, workout, quote) weights for every value of one bitmap byte.
+
+    Args:
+        first_bit: Position of the byte's lowest bit in the bitmap
+
+    Returns:
+        256 score tuples, indexed by byte value
+    """
+    weights = _RULE_WEIGHTS[first_bit : first_bit + 8]
+    byte_scores = _unpack_bits(np.arange(256), len(weights)) @ weights
+    return tuple(map(tuple, byte_scores.tolist()))
+
+
+# Per-byte score lookup tables, so scoring a bitmap is one lookup per byte, no branches
+_BYTE_SCORE_TABLES = tuple(_byte_score_table(bit) for bit in range(0, len(_RULES), 8))
+
+
+@dataclass(slots=True, frozen=True)
 class ClassificationResult:
     """Result of classification with scores and chosen type."""
 
@@ -21,128 +95,152 @@ class ClassificationResult:
     threshold: float
 
 
-def score_recipe(feats: Features) -> float:
+def _line_signals(feats: Features) -> Tuple[bool, int, bool, bool]:
     """
-    Compute recipe score based on features.
+    Scan the OCR lines once for every line-level scoring signal.
+
+    Stops early once every signal is saturated.
 
     Args:
         feats: Features object
 
     Returns:
-        Recipe score (higher = more likely to be a recipe)
+        Tuple of (has_serves_line, sets_reps_lines capped at 2,
+        has_set_rep_notation, has_quote_line)
     """
-    score = 0.0
-
-    # +3 if any INGREDIENT_SECTION_TERMS appears
-    if feats.has_ingredients_section:
-        score += 3.0
+    has_serves_line = False
+    sets_reps_lines = 0
+    has_set_rep_notation = False
+    has_quote_line = False
 
-    # +2 if num_units >= 3
-    if feats.num_units >= 3:
-        score += 2.0
+    for line, line_lower in zip(feats.ocr.lines, feats.lines_lower):
+        # Line matches "serves X" or "makes X"
+        if not has_serves_line and _SERVES_PATTERN.search(line):
+            has_serves_line = True
 
-    # +2 if num_cooking_verbs >= 2
-    if feats.num_cooking_verbs >= 2:
-        score += 2.0
+        # Line mentions "sets" or "reps"
+        if sets_reps_lines < 2 and ("sets" in line_lower or "reps" in line_lower):
+            sets_reps_lines += 1
 
-    # +1 if bullet_lines >= 3
-    if feats.layout.bullet_lines >= 3:
-        score += 1.0
+        # Line contains a pattern like 3x10 / 3 x 10
+        if not has_set_rep_notation and _WORKOUT_PATTERN.search(line):
+            has_set_rep_notation = True
 
-    # +1 if numbered_lines >= 2
-    if feats.layout.numbered_lines >= 2:
-        score += 1.0
+        # Line contains quote marks and 4+ words
+        if (
+            not has_quote_line
+            and len(line.split()) >= 4
+            and not QUOTE_MARKER_CHARS.isdisjoint(line)
+        ):
+            has_quote_line = True
 
-    # +1 if any line matches "serves X" or "makes X"
-    serves_pattern = re.compile(r"(serves|makes)\s+\d+", re.IGNORECASE)
-    if any(serves_pattern.search(line) for line in feats.ocr.lines):
-        score += 1.0
+        if has_serves_line and sets_reps_lines >= 2 and has_set_rep_notation and has_quote_line:
+            break
 
-    return score
+    return has_serves_line, sets_reps_lines, has_set_rep_notation, has_quote_line
 
 
-def score_workout(feats: Features) -> float:
+def predicate_bits(feats: Features) -> int:
     """
-    Compute workout score based on features.
+    Pack every scoring condition into one integer bitmap.
+
+    Bit i is set when rule i of _RULES holds for feats.
 
     Args:
         feats: Features object
 
     Returns:
-        Workout score (higher = more likely to be a workout)
+        Bitmap of satisfied scoring rules
     """
-    score = 0.0
-
-    # +3 if "sets" or "reps" appears in multiple lines
-    sets_reps_count = sum(
-        1
-        for line in feats.ocr.lines
-        if "sets" in line.lower() or "reps" in line.lower()
+    has_serves_line, sets_reps_lines, has_set_rep_notation, has_quote_line = _line_signals(
+        feats
+    )
+    layout = feats.layout
+
+    return (
+        # Recipe
+        feats.has_ingredients_section << 0
+        | (feats.num_units >= 3) << 1
+        | (feats.num_cooking_verbs >= 2) << 2
+        | (layout.bullet_lines >= 3) << 3
+        | (layout.numbered_lines >= 2) << 4
+        | has_serves_line << 5
+        # Workout (bit 0 also subtracts 2, to avoid misclassifying recipes as workouts)
+        | (sets_reps_lines >= 2) << 6
+        | has_set_rep_notation << 7
+        | (feats.num_workout_terms >= 2) << 8
+        | (feats.num_body_parts > 0) << 9
+        | (layout.bullet_lines >= 2 or layout.numbered_lines >= 2) << 10
+        # Quote
+        | has_quote_line << 11
+        | feats.has_quote_author_pattern << 12
+        | (1 <= layout.line_count <= 6) << 13
+        | (layout.avg_line_length >= 40) << 14
+        | (feats.num_units == 0 and feats.num_workout_terms == 0) << 15
     )
-    if sets_reps_count >= 2:
-        score += 3.0
-
-    # +2 if a pattern like 3x10 / 3 x 10 occurs
-    workout_pattern = re.compile(r"\d+\s*[x×]\s*\d+", re.IGNORECASE)
-    if any(workout_pattern.search(line) for line in feats.ocr.lines):
-        score += 2.0
 
-    # +2 if num_workout_terms >= 2
-    if feats.num_workout_terms >= 2:
-        score += 2.0
 
-    # +1 if any WORKOUT_BODY_PARTS appears
-    if feats.num_body_parts > 0:
-        score += 1.0
+def _score_all(feats: Features) -> Tuple[float, float, float]:
+    """
+    Compute recipe, workout and quote scores together.
 
-    # +1 if there are bullet/numbered lines suggesting a list
-    if feats.layout.bullet_lines >= 2 or feats.layout.numbered_lines >= 2:
-        score += 1.0
+    Scores are the summed _RULES weights of the set predicate bits, looked up
+    one byte of the bitmap at a time.
 
-    # Subtract 2 if has_ingredients_section is True (to avoid misclassifying recipes as workouts)
-    if feats.has_ingredients_section:
-        score -= 2.0
+    Args:
+        feats: Features object
 
-    return score
+    Returns:
+        Tuple of (recipe, workout, quote) scores
+    """
+    bits = predicate_bits(feats)
+    recipe = workout = quote = 0.0
+    for table in _BYTE_SCORE_TABLES:
+        byte_recipe, byte_workout, byte_quote = table[bits & 0xFF]
+        recipe += byte_recipe
+        workout += byte_workout
+        quote += byte_quote
+        bits >>= 8
+    return recipe, workout, quote
 
 
-def score_quote(feats: Features) -> float:
+def score_recipe(feats: Features) -> float:
     """
-    Compute quote score based on features.
+    Compute recipe score based on features.
 
     Args:
         feats: Features object
 
     Returns:
-        Quote score (higher = more likely to be a quote)
+        Recipe score (higher = more likely to be a recipe)
     """
-    score = 0.0
+    return _score_all(feats)[0]
 
-    # +2 if any line contains quote marks and 4+ words
-    for line in feats.ocr.lines:
-        word_count = len(line.split())
-        has_quote_mark = any(marker in line for marker in QUOTE_MARKERS)
-        if has_quote_mark and word_count >= 4:
-            score += 2.0
-            break  # Only count once
 
-    # +3 if has_quote_author_pattern
-    if feats.has_quote_author_pattern:
-        score += 3.0
+def score_workout(feats: Features) -> float:
+    """
+    Compute workout score based on features.
+
+    Args:
+        feats: Features object
+
+    Returns:
+        Workout score (higher = more likely to be a workout)
+    """
+    return _score_all(feats)[1]
 
-    # +1 if 1 <= line_count <= 6
-    if 1 <= feats.layout.line_count <= 6:
-        score += 1.0
 
-    # +1 if avg_line_length is relatively high (prose) - threshold at 40 chars
-    if feats.layout.avg_line_length >= 40:
-        score += 1.0
+def score_quote(feats: Features) -> float:
+    """
+    Compute quote score based on features.
 
-    # +1 if num_units == 0 and num_workout_terms == 0
-    if feats.num_units == 0 and feats.num_workout_terms == 0:
-        score += 1.0
+    Args:
+        feats: Features object
 
-    return score
+    Returns:
+        Quote score (higher = more likely to be a quote)
+    """
+    return _score_all(feats)[2]
 
 
 def classify(feats: Features, threshold: float = 5.0) -> ClassificationResult:
@@ -158,24 +256,29 @@ def classify(feats: Features, threshold: float = 5.0) -> ClassificationResult:
     Returns:
         ClassificationResult with item_type, scores, and threshold
     """
-    scores = {
-        "recipe": score_recipe(feats),
-        "workout": score_workout(feats),
-        "quote": score_quote(feats),
-    }
+    recipe, workout, quote = _score_all(feats)
 
-    # Find the best type
-    best_type = max(scores, key=scores.get)
-    best_score = scores[best_type]
+    # Find the best type (ties go to the earlier type, as max() over the dict did)
+    if recipe >= workout and recipe >= quote:
+        best_type, best_score = "recipe", recipe
+    elif workout >= quote:
+        best_type, best_score = "workout", workout
+    else:
+        best_type, best_score = "quote", quote
 
     # If best score < threshold, return "none"
-    if best_score < threshold:
-        item_type: ItemType = "none"
-    else:
-        item_type = best_type  # type: ignore
+    item_type: ItemType = best_type if best_score >= threshold else "none"  # type: ignore
 
+    scores = {
+        "recipe": recipe,
+        "workout": workout,
+        "quote": quote,
+    }
+
+    # Lazy %-formatting: classify runs once per sample, so skip building the
+    # message unless debug logging is on
     logger.debug(
-        f"Classification: {item_type} (scores: {scores}, threshold: {threshold})"
+        "Classification: %s (scores: %s, threshold: %s)", item_type, scores, threshold
     )
 
     return ClassificationResult(
@@ -184,3 +287,65 @@ def classify(feats: Features, threshold: float = 5.0) -> ClassificationResult:
         threshold=threshold,
     )
 
+
+def feature_row(feats: Features) -> Dict[str, float]:
+    """
+    Flatten Features into the scalar columns consumed by classify_batch.
+
+    Args:
+        feats: Features object
+
+    Returns:
+        Dictionary of column name -> value, one row of a features DataFrame.
+        The "bits" column holds predicate_bits(feats); the rest are kept for
+        inspecting the dataset.
+    """
+    return {
+        "line_count": feats.layout.line_count,
+        "bullet_lines": feats.layout.bullet_lines,
+        "numbered_lines": feats.layout.numbered_lines,
+        "avg_line_length": feats.layout.avg_line_length,
+        "num_units": feats.num_units,
+        "num_cooking_verbs": feats.num_cooking_verbs,
+        "num_workout_terms": feats.num_workout_terms,
+        "num_body_parts": feats.num_body_parts,
+        "has_ingredients_section": feats.has_ingredients_section,
+        "has_steps_section": feats.has_steps_section,
+        "has_quote_author_pattern": feats.has_quote_author_pattern,
+        "quote_mark_count": feats.quote_mark_count,
+        "bits": predicate_bits(feats),
+    }
+
+
+def score_batch(feats_df) -> np.ndarray:
+    """
+    Compute recipe/workout/quote scores for many samples at once.
+
+    Vectorized equivalent of score_recipe/score_workout/score_quote: the
+    predicate bitmaps are unpacked and multiplied by the rule weight matrix.
+
+    Args:
+        feats_df: pandas DataFrame with one feature_row() per sample
+
+    Returns:
+        (N, 3) float array of scores, columns ordered as SCORED_TYPES
+    """
+    bits = feats_df["bits"].to_numpy(dtype=np.int64)
+    return _unpack_bits(bits, len(_RULES)) @ _RULE_WEIGHTS
+
+
+def classify_batch(feats_df, threshold: float = 5.0) -> np.ndarray:
+    """
+    Classify many samples at once; vectorized equivalent of classify.
+
+    Args:
+        feats_df: pandas DataFrame with one feature_row() per sample
+        threshold: Minimum score to classify as a specific type (default: 5.0)
+
+    Returns:
+        uint8 array of ItemTypeEnum ids, one per row (ITEM_TYPES maps them to names)
+    """
+    scores = score_batch(feats_df)
+    best_idx = scores.argmax(axis=1)
+    best_score = scores[np.arange(len(scores)), best_idx]
+    return np.where(best_score < threshold, ItemTypeEnum.NONE, best_idx).astype(np.uint8)
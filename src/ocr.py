@@ -1,18 +1,37 @@
 """OCR module with caching support."""
 
+import hashlib
+import io
 import json
 import logging
-from dataclasses import dataclass, asdict
+import sqlite3
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 
-import pytesseract
-from PIL import Image
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib json module
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# SQLite database holding cached OCR results, created inside the cache directory
+CACHE_DB_NAME = "ocr_cache.sqlite3"
 
-@dataclass
+# Tesseract settings: LSTM engine, screenshot treated as one uniform block of text
+TESSERACT_CONFIG = "--psm 6 --oem 1"
+
+# Longest side (px) images are downscaled to before OCR; tesseract accuracy
+# saturates well below phone screenshot resolution
+MAX_OCR_DIMENSION = 1600
+
+# Per-thread cache connections (sqlite3 connections can't be shared across threads)
+_thread_local = threading.local()
+
+
+@dataclass(slots=True, frozen=True)
 class OcrResult:
     """OCR result containing full text and line-by-line breakdown."""
 
@@ -20,11 +39,60 @@ class OcrResult:
     lines: List[str]
 
 
+def _dumps_lines(lines: List[str]) -> str:
+    """Serialize OCR lines for the cache as compact JSON."""
+    if orjson is not None:
+        return orjson.dumps(lines).decode("utf-8")
+    return json.dumps(lines, ensure_ascii=False, separators=(",", ":"))
+
+
+def _loads_lines(data: str) -> List[str]:
+    """Deserialize cached OCR lines."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _get_cache_connection(cache_dir: Path) -> sqlite3.Connection:
+    """
+    Return this thread's connection to the OCR cache in cache_dir.
+
+    The connection is opened (and the schema created) once per thread and
+    directory, then reused by every later run_ocr call.
+
+    Args:
+        cache_dir: Directory containing the cache database
+
+    Returns:
+        Open sqlite3 connection
+    """
+    connections: Optional[Dict[Path, sqlite3.Connection]] = getattr(
+        _thread_local, "connections", None
+    )
+    if connections is None:
+        connections = _thread_local.connections = {}
+
+    conn = connections.get(cache_dir)
+    if conn is None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(cache_dir / CACHE_DB_NAME)
+        # WAL lets OCR threads read while another thread writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_results ("
+            "image_hash BLOB PRIMARY KEY, full_text TEXT NOT NULL, lines TEXT NOT NULL)"
+        )
+        connections[cache_dir] = conn
+    return conn
+
+
 def run_ocr(image_path: Path, cache_dir: Path = None) -> OcrResult:
     """
     Run OCR on an image and return text + lines.
 
-    Use a simple JSON cache in data/ocr_cache so we don't repeatedly OCR the same file.
+    Results are cached in a SQLite database in data/ocr_cache, keyed by a hash
+    of the image contents, so we don't repeatedly OCR the same image (even if it
+    is renamed) and an edited image is never served a stale result.
 
     Args:
         image_path: Path to the image file
@@ -36,29 +104,44 @@ def run_ocr(image_path: Path, cache_dir: Path = None) -> OcrResult:
     if cache_dir is None:
         cache_dir = Path(__file__).parent.parent / "data" / "ocr_cache"
 
-    cache_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        image_bytes = image_path.read_bytes()
+    except OSError as e:
+        logger.error(f"OCR failed for {image_path}: {e}")
+        return OcrResult(full_text="", lines=[])
 
-    # Create cache file path based on image basename
-    cache_file = cache_dir / f"{image_path.stem}.json"
+    # Cache key based on image content and OCR settings, so changing the
+    # settings never serves results produced under the old ones
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f"{TESSERACT_CONFIG}|{MAX_OCR_DIMENSION}|".encode())
+    hasher.update(image_bytes)
+    image_hash = hasher.digest()
 
     # Check cache first
-    if cache_file.exists():
-        try:
-            with open(cache_file, "r", encoding="utf-8") as f:
-                cached_data = json.load(f)
-                logger.info(f"Loaded OCR result from cache: {cache_file}")
-                return OcrResult(
-                    full_text=cached_data["full_text"],
-                    lines=cached_data["lines"],
-                )
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.warning(f"Failed to load cache file {cache_file}: {e}. Re-running OCR.")
-
-    # Run OCR
     try:
+        conn = _get_cache_connection(cache_dir)
+        row = conn.execute(
+            "SELECT full_text, lines FROM ocr_results WHERE image_hash = ?", (image_hash,)
+        ).fetchone()
+        if row is not None:
+            logger.info(f"Loaded OCR result from cache for {image_path}")
+            return OcrResult(full_text=row[0], lines=_loads_lines(row[1]))
+    except (sqlite3.Error, json.JSONDecodeError) as e:
+        conn = None
+        logger.warning(f"Failed to read OCR cache for {image_path}: {e}. Re-running OCR.")
+
+    # Run OCR (imported here so cache hits and feature-only users skip loading them)
+    try:
+        import pytesseract
+        from PIL import Image
+
         logger.info(f"Running OCR on {image_path}")
-        image = Image.open(image_path)
-        full_text = pytesseract.image_to_string(image).strip()
+        # Grayscale and downscale first: fewer bytes for tesseract to decode
+        with Image.open(io.BytesIO(image_bytes)) as source:
+            image = source.convert("L")
+        image.thumbnail((MAX_OCR_DIMENSION, MAX_OCR_DIMENSION), Image.Resampling.LANCZOS)
+
+        full_text = pytesseract.image_to_string(image, config=TESSERACT_CONFIG).strip()
 
         # Split into lines and normalize
         lines = [
@@ -70,12 +153,16 @@ def run_ocr(image_path: Path, cache_dir: Path = None) -> OcrResult:
         result = OcrResult(full_text=full_text, lines=lines)
 
         # Cache the result
-        try:
-            with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(asdict(result), f, indent=2, ensure_ascii=False)
-            logger.info(f"Cached OCR result to {cache_file}")
-        except Exception as e:
-            logger.warning(f"Failed to cache OCR result: {e}")
+        if conn is not None:
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO ocr_results VALUES (?, ?, ?)",
+                        (image_hash, full_text, _dumps_lines(lines)),
+                    )
+                logger.info(f"Cached OCR result for {image_path}")
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to cache OCR result: {e}")
 
         return result
 
@@ -83,4 +170,3 @@ def run_ocr(image_path: Path, cache_dir: Path = None) -> OcrResult:
         logger.error(f"OCR failed for {image_path}: {e}")
         # Return empty result on failure
         return OcrResult(full_text="", lines=[])
-
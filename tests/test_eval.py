@@ -0,0 +1,85 @@
+"""Tests for dataset evaluation."""
+
+import numpy as np
+import pytest
+from sklearn.metrics import accuracy_score, confusion_matrix, precision_recall_fscore_support
+
+from src import eval as eval_module
+from src.eval import evaluate_dataset
+from src.features import compute_features
+from src.heuristics import ITEM_TYPES, classify
+from src.ocr import OcrResult
+
+OCR_TEXTS = {
+    "recipe": "Ingredients\n• 200 g flour\n• 2 tbsp sugar\n• 1 cup milk\nServes 4\n"
+    "1. Preheat oven\n2. Mix and bake",
+    "workout": "Leg day\n3x10 squats\n4 sets of 8 reps lunges\n3 sets 12 reps glutes bridge\nRest 60s",
+    "quote": '"The only way to do great work is to love what you do."\n— Steve Jobs',
+    "none": "Battery 80%\nWi-Fi connected",
+}
+
+
+def make_ocr(text: str) -> OcrResult:
+    """Build the OcrResult run_ocr would return for text."""
+    return OcrResult(full_text=text, lines=[line.strip() for line in text.splitlines() if line.strip()])
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Point evaluation at a scratch project whose OCR output is keyed by image name."""
+    monkeypatch.setattr(eval_module, "PROJECT_ROOT", tmp_path)
+    eval_module._resolve_image_path.cache_clear()
+    monkeypatch.setattr(eval_module, "run_ocr", lambda image_path: make_ocr(OCR_TEXTS[image_path.stem]))
+    yield tmp_path
+    eval_module._resolve_image_path.cache_clear()
+
+
+def test_evaluate_dataset_matches_sklearn(project):
+    """Test the confusion matrix and metrics agree with sklearn, skipping bad rows."""
+    (project / "data" / "raw").mkdir(parents=True)
+    for kind in OCR_TEXTS:
+        (project / "data" / "raw" / f"{kind}.png").write_bytes(b"")
+
+    # (image, label) rows, including one bad label and one missing image
+    rows = [
+        ("recipe", "recipe"),
+        ("workout", "workout"),
+        ("quote", "Quote "),
+        ("none", "none"),
+        ("workout", "recipe"),
+        ("quote", "none"),
+        ("recipe", "bogus"),
+        ("missing", "recipe"),
+    ]
+    labels_file = project / "data" / "labelled" / "labels.csv"
+    labels_file.parent.mkdir(parents=True)
+    labels_file.write_text(
+        "image_path,true_label\n"
+        + "".join(f"data/raw/{image}.png,{label}\n" for image, label in rows),
+        encoding="utf-8",
+    )
+
+    results = evaluate_dataset(threshold=5.0, max_workers=2)
+
+    kept = [(image, label.strip().lower()) for image, label in rows[:6]]
+    y_true = [label for _, label in kept]
+    y_pred = [classify(compute_features(make_ocr(OCR_TEXTS[image])), 5.0).item_type for image, _ in kept]
+
+    assert results["num_samples"] == 6
+    np.testing.assert_array_equal(
+        results["confusion_matrix"], confusion_matrix(y_true, y_pred, labels=list(ITEM_TYPES))
+    )
+    precision, recall, _, _ = precision_recall_fscore_support(
+        y_true, y_pred, labels=list(ITEM_TYPES), zero_division=0
+    )
+    assert results["per_class_precision"] == pytest.approx(dict(zip(ITEM_TYPES, precision)))
+    assert results["per_class_recall"] == pytest.approx(dict(zip(ITEM_TYPES, recall)))
+    assert results["overall_accuracy"] == pytest.approx(accuracy_score(y_true, y_pred))
+
+
+def test_evaluate_dataset_no_labels_file(project):
+    """Test a missing labels file yields empty metrics and creates the file."""
+    results = evaluate_dataset()
+    assert results["confusion_matrix"].sum() == 0
+    assert results["overall_accuracy"] == 0.0
+    assert (project / "data" / "labelled" / "labels.csv").exists()
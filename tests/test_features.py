@@ -108,3 +108,45 @@ def test_compute_features_edge_cases():
     assert features.has_steps_section is False
     assert features.has_quote_author_pattern is False
 
+
+def test_compute_features_whole_word_vocabulary():
+    """Vocabulary terms only count as whole words, not inside other words."""
+    ocr_prose = OcrResult(
+        full_text="A great background story about the mixer",
+        lines=["A great background story about the mixer"],
+    )
+    features = compute_features(ocr_prose)
+    assert features.num_units == 0  # "g" in "great"/"background"
+    assert features.num_body_parts == 0  # "back" in "background"
+    assert features.num_cooking_verbs == 0  # "mix" in "mixer"
+
+    # Hyphenated terms still match as a whole
+    ocr_workout = OcrResult(full_text="Warm-up then 3 rounds", lines=["Warm-up then 3 rounds"])
+    assert compute_features(ocr_workout).num_workout_terms == 2
+
+
+def test_compute_features_inflected_vocabulary():
+    """Inflected vocabulary words count as their base form."""
+    text = "Chopped onions, boiled pasta, stirring, whisked eggs, baked. Serves 4"
+    features = compute_features(OcrResult(full_text=text, lines=[text]))
+    # chop, boil, stir, whisk, bake, serve
+    assert features.num_cooking_verbs == 6
+
+    text = "Fried rice, 2 cups of flour, rested legs"
+    features = compute_features(OcrResult(full_text=text, lines=[text]))
+    assert features.num_cooking_verbs == 1  # fry
+    assert features.num_units == 1  # cups
+    assert features.num_workout_terms == 1  # rest
+    assert features.num_body_parts == 1  # legs
+
+
+def test_compute_features_quote_markers():
+    """Smart quotes count as quote markers; commas do not."""
+    ocr_smart = OcrResult(
+        full_text="“Stay hungry, stay foolish.”",
+        lines=["“Stay hungry, stay foolish.”"],
+    )
+    assert compute_features(ocr_smart).quote_mark_count == 2
+
+    ocr_plain = OcrResult(full_text="Milk, eggs, flour", lines=["Milk, eggs, flour"])
+    assert compute_features(ocr_plain).quote_mark_count == 0
@@ -1,12 +1,19 @@
 """Tests for heuristic classifier."""
 
+import pandas as pd
 import pytest
 from src.heuristics import (
     score_recipe,
     score_workout,
     score_quote,
     classify,
+    classify_batch,
+    feature_row,
+    predicate_bits,
+    ITEM_TYPES,
+    score_batch,
     ClassificationResult,
+    _RULES,
 )
 from src.features import Features, LayoutFeatures
 from src.ocr import OcrResult
@@ -209,3 +216,75 @@ def test_classify_threshold():
     result_high = classify(feats_recipe, threshold=100.0)
     assert result_high.item_type == "none"
 
+
+def test_classify_batch_matches_classify():
+    """Vectorized batch classification agrees with per-sample classify."""
+    samples = [
+        create_test_features(
+            text="Ingredients\n2 cups flour\nServes 4\nMix and bake",
+            num_units=3,
+            num_cooking_verbs=2,
+            has_ingredients_section=True,
+            bullet_lines=3,
+        ),
+        create_test_features(
+            text="3x10 squats\n4 sets of 8 reps\n3 sets 12 reps",
+            num_workout_terms=2,
+            num_body_parts=1,
+            numbered_lines=2,
+        ),
+        create_test_features(
+            text='"The only way to do great work is to love what you do."\n— Steve Jobs',
+            has_quote_author_pattern=True,
+        ),
+        create_test_features(text="Random text with no clear pattern"),
+    ]
+    feats_df = pd.DataFrame([feature_row(feats) for feats in samples])
+
+    scores = score_batch(feats_df)
+    for threshold in (1.0, 5.0, 10.0):
+        predicted = classify_batch(feats_df, threshold=threshold)
+        for i, feats in enumerate(samples):
+            result = classify(feats, threshold=threshold)
+            assert list(scores[i]) == [
+                result.scores["recipe"],
+                result.scores["workout"],
+                result.scores["quote"],
+            ]
+            assert ITEM_TYPES[predicted[i]] == result.item_type
+
+
+def test_predicate_bits_match_rules():
+    """Every _RULES entry has a predicate bit, and no bit falls outside _RULES."""
+    # Baseline with no rule satisfied; each case changes it and lists the
+    # rule indexes whose bits must flip (and no others)
+    base = dict(num_units=1, line_count=7)
+    cases = [
+        (dict(has_ingredients_section=True), {0}),
+        (dict(num_units=3), {1}),
+        (dict(num_cooking_verbs=2), {2}),
+        (dict(bullet_lines=3), {3, 10}),
+        (dict(numbered_lines=2), {4, 10}),
+        (dict(lines=["Serves 4"]), {5}),
+        (dict(lines=["3 sets", "8 reps"]), {6}),
+        (dict(lines=["3x10"]), {7}),
+        (dict(num_workout_terms=2), {8}),
+        (dict(num_body_parts=1), {9}),
+        (dict(bullet_lines=2), {10}),
+        (dict(lines=['"Do it now" she said']), {11}),
+        (dict(has_quote_author_pattern=True), {12}),
+        (dict(line_count=3), {13}),
+        (dict(avg_line_length=40.0), {14}),
+        (dict(num_units=0), {15}),
+    ]
+
+    base_bits = predicate_bits(create_test_features(**base))
+    assert base_bits == 0
+
+    toggled = set()
+    for change, expected in cases:
+        bits = predicate_bits(create_test_features(**{**base, **change}))
+        assert bits >> len(_RULES) == 0, change
+        assert {i for i in range(len(_RULES)) if (bits ^ base_bits) >> i & 1} == expected, change
+        toggled |= expected
+    assert toggled == set(range(len(_RULES)))
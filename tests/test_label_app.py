@@ -0,0 +1,99 @@
+"""Tests for the labelling app's labels CSV handling."""
+
+import shutil
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from streamlit.testing.v1 import AppTest
+
+APP_FILE = Path(__file__).parent.parent / "ui" / "label_app.py"
+HEADER = "image_path,true_label\n"
+IMAGES = ["data/raw/recipes/a.png", "data/raw/recipes/b.png", "data/raw/recipes/c.png"]
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Scratch project with a copy of the app and three images."""
+    (tmp_path / "ui").mkdir()
+    shutil.copy(APP_FILE, tmp_path / "ui" / "label_app.py")
+    for i, image in enumerate(IMAGES):
+        (tmp_path / image).parent.mkdir(parents=True, exist_ok=True)
+        Image.new("RGB", (8, 8), (i * 80, 0, 0)).save(tmp_path / image)
+    return tmp_path
+
+
+def run_app(project: Path) -> AppTest:
+    """Run the app copy in project once."""
+    at = AppTest.from_file(str(project / "ui" / "label_app.py"), default_timeout=30).run()
+    assert not at.exception
+    return at
+
+
+def label_image(at: AppTest, image: str, button: str) -> AppTest:
+    """Jump to image via the sidebar, then click a label button."""
+    at.sidebar.selectbox[0].select(image)
+    at = at.run()
+    next(b for b in at.button if button in b.label).click()
+    at = at.run()
+    assert not at.exception
+    return at
+
+
+def metrics(at: AppTest) -> dict:
+    """Sidebar metric values by label."""
+    return {m.label: m.value for m in at.metric}
+
+
+def test_new_labels_are_appended(project):
+    """Test new labels are appended as rows, with \\n line endings."""
+    at = run_app(project)
+    labels_file = project / "data" / "labelled" / "labels.csv"
+    assert labels_file.read_text(encoding="utf-8") == HEADER
+
+    at = label_image(at, IMAGES[0], "Recipe")
+    at = label_image(at, IMAGES[2], "Quote")
+
+    assert labels_file.read_bytes() == (
+        f"{HEADER}{IMAGES[0]},recipe\n{IMAGES[2]},quote\n".encode()
+    )
+    assert metrics(at)["Unlabelled"] == "1"
+
+    # The labelled-path set tracks the app's own writes without a rebuild
+    stat = labels_file.stat()
+    assert at.session_state["_labelled_set"] == {IMAGES[0], IMAGES[2]}
+    assert at.session_state["_labelled_set_key"] == (stat.st_mtime_ns, stat.st_size)
+
+
+def test_relabel_rewrites_in_place(project):
+    """Test relabelling keeps row order, adds no duplicate and leaves no temp file."""
+    labels_file = project / "data" / "labelled" / "labels.csv"
+    labels_file.parent.mkdir(parents=True)
+    labels_file.write_text(
+        f"{HEADER}{IMAGES[0]},recipe\n{IMAGES[1]},recipe\n{IMAGES[2]},none\n", encoding="utf-8"
+    )
+
+    at = run_app(project)
+    assert metrics(at)["Labelled"] == "3"
+    at = label_image(at, IMAGES[1], "Workout")
+
+    assert labels_file.read_text(encoding="utf-8") == (
+        f"{HEADER}{IMAGES[0]},recipe\n{IMAGES[1]},workout\n{IMAGES[2]},none\n"
+    )
+    assert not labels_file.with_suffix(".csv.tmp").exists()
+    assert metrics(at)["Labelled"] == "3"
+    assert "**workout**: 1" in [m.value for m in at.sidebar.markdown]
+
+
+def test_header_only_file(project):
+    """Test a header-only labels file is treated as no labels."""
+    labels_file = project / "data" / "labelled" / "labels.csv"
+    labels_file.parent.mkdir(parents=True)
+    labels_file.write_text(HEADER, encoding="utf-8")
+
+    at = run_app(project)
+    assert metrics(at) == {"Total Images": "3", "Unlabelled": "3", "Labelled": "0"}
+    assert at.session_state["_labelled_set"] == set()
+
+    at = label_image(at, IMAGES[1], "None")
+    assert labels_file.read_text(encoding="utf-8") == f"{HEADER}{IMAGES[1]},none\n"
@@ -0,0 +1,65 @@
+"""Tests for OCR caching."""
+
+import pytest
+import pytesseract
+from PIL import Image
+
+from src.ocr import OcrResult, run_ocr
+
+
+@pytest.fixture
+def fake_tesseract(monkeypatch):
+    """Replace tesseract with a stub that reports the top-left pixel value."""
+    calls = []
+
+    def image_to_string(image, config=""):
+        calls.append(image)
+        return f"Pixel {image.getpixel((0, 0))}\n\nSecond line\n"
+
+    monkeypatch.setattr(pytesseract, "image_to_string", image_to_string)
+    return calls
+
+
+def test_run_ocr_cache_hit(tmp_path, fake_tesseract):
+    """Test a repeated call is served from the cache without running OCR."""
+    image_path = tmp_path / "shot.png"
+    Image.new("L", (20, 20), 10).save(image_path)
+    cache_dir = tmp_path / "cache"
+
+    first = run_ocr(image_path, cache_dir=cache_dir)
+    assert first.full_text == "Pixel 10\n\nSecond line"
+    assert first.lines == ["Pixel 10", "Second line"]
+    assert len(fake_tesseract) == 1
+
+    second = run_ocr(image_path, cache_dir=cache_dir)
+    assert second == first
+    assert len(fake_tesseract) == 1
+
+
+def test_run_ocr_same_stem_different_bytes(tmp_path, fake_tesseract):
+    """Test images sharing a file stem but not contents get separate cache entries."""
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    image_a = tmp_path / "a" / "shot.png"
+    image_b = tmp_path / "b" / "shot.png"
+    Image.new("L", (20, 20), 10).save(image_a)
+    Image.new("L", (20, 20), 200).save(image_b)
+    cache_dir = tmp_path / "cache"
+
+    result_a = run_ocr(image_a, cache_dir=cache_dir)
+    result_b = run_ocr(image_b, cache_dir=cache_dir)
+    assert result_a.lines[0] == "Pixel 10"
+    assert result_b.lines[0] == "Pixel 200"
+    assert len(fake_tesseract) == 2
+
+    # Both are now cached under their own keys
+    assert run_ocr(image_a, cache_dir=cache_dir) == result_a
+    assert run_ocr(image_b, cache_dir=cache_dir) == result_b
+    assert len(fake_tesseract) == 2
+
+
+def test_run_ocr_missing_image(tmp_path, fake_tesseract):
+    """Test a missing image returns an empty result."""
+    result = run_ocr(tmp_path / "missing.png", cache_dir=tmp_path / "cache")
+    assert result == OcrResult(full_text="", lines=[])
+    assert fake_tesseract == []
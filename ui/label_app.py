@@ -1,9 +1,11 @@
 """Streamlit app for labeling images."""
 
+import csv
 import logging
+import os
+from collections import Counter
 from pathlib import Path
 
-import pandas as pd
 import streamlit as st
 
 # Configure logging
@@ -15,89 +17,237 @@ PROJECT_ROOT = Path(__file__).parent.parent
 RAW_DATA_DIR = PROJECT_ROOT / "data" / "raw"
 LABELS_FILE = PROJECT_ROOT / "data" / "labelled" / "labels.csv"
 
-# Supported image extensions
-IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".PNG", ".JPG", ".JPEG"}
+# Supported image extensions (matched case-insensitively)
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
 
+# Labels CSV columns; a file no larger than its header holds no labels
+LABELS_FIELDS = ["image_path", "true_label"]
+LABELS_HEADER = (",".join(LABELS_FIELDS) + "\n").encode()
 
-def load_labels() -> pd.DataFrame:
-    """Load or create labels CSV."""
-    LABELS_FILE.parent.mkdir(parents=True, exist_ok=True)
+# Most images offered in the "Jump to Image" selectbox at once
+MAX_IMAGE_OPTIONS = 500
 
-    if LABELS_FILE.exists():
+
+@st.cache_data(show_spinner=False)
+def _load_labels_cached(mtime_ns: int, size: int) -> dict[str, str]:
+    """Parse the labels CSV; cached until its mtime or size changes."""
+    with LABELS_FILE.open(newline="", encoding="utf-8") as f:
+        return {
+            row["image_path"]: row["true_label"]
+            for row in csv.DictReader(f)
+            if row.get("image_path")
+        }
+
+
+def _seed_labelled_set(labels: dict[str, str], key: tuple | None) -> None:
+    """Rebuild the session's labelled-path set when the labels file has changed."""
+    if "_labelled_set" not in st.session_state or st.session_state.get("_labelled_set_key") != key:
+        st.session_state["_labelled_set"] = set(labels)
+        st.session_state["_labelled_set_key"] = key
+
+
+def load_labels() -> dict[str, str]:
+    """
+    Load or create labels CSV.
+
+    Also keeps st.session_state["_labelled_set"], the set of labelled image
+    paths, in sync with the file for O(1) membership checks.
+
+    Returns:
+        Mapping of image path (relative to the project root) to its label
+    """
+    try:
         try:
-            df = pd.read_csv(LABELS_FILE)
-            return df
-        except Exception as e:
-            logger.error(f"Error loading labels: {e}")
-            return pd.DataFrame(columns=["image_path", "true_label"])
-    else:
-        # Create empty file with header
-        df = pd.DataFrame(columns=["image_path", "true_label"])
-        df.to_csv(LABELS_FILE, index=False)
-        return df
+            stat = LABELS_FILE.stat()
+        except FileNotFoundError:
+            # Create empty file with header (and its folder, on first run)
+            LABELS_FILE.parent.mkdir(parents=True, exist_ok=True)
+            LABELS_FILE.write_bytes(LABELS_HEADER)
+            stat = LABELS_FILE.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        if stat.st_size <= len(LABELS_HEADER):
+            # Header only (e.g. just created): nothing to parse
+            labels = {}
+        else:
+            # Key the cache on the file's stat so reruns skip re-parsing
+            # until the CSV is written again
+            labels = _load_labels_cached(*key)
+    except Exception as e:
+        logger.error(f"Error loading labels: {e}")
+        key = None
+        labels = {}
+
+    _seed_labelled_set(labels, key)
+    return labels
 
 
 def save_label(image_path: Path, label: str) -> None:
-    """Append a new label to the CSV."""
-    df = load_labels()
+    """Save a label, appending a row unless the image is already labelled."""
+    labels = load_labels()
 
     # Convert to relative path for storage
     try:
         rel_path = image_path.relative_to(PROJECT_ROOT)
     except ValueError:
         rel_path = image_path
-
-    new_row = pd.DataFrame(
-        {
-            "image_path": [str(rel_path)],
-            "true_label": [label],
-        }
-    )
-
-    # Check if already exists and update, otherwise append
-    if "image_path" in df.columns and str(rel_path) in df["image_path"].values:
-        df.loc[df["image_path"] == str(rel_path), "true_label"] = label
+    rel_str = str(rel_path)
+
+    if rel_str in labels:
+        # Relabel: update the row in place (keeping file order) and rewrite.
+        # Write a temp file and swap it in, so a crash mid-write can't leave
+        # a truncated labels file behind
+        labels[rel_str] = label
+        tmp_file = LABELS_FILE.with_suffix(".csv.tmp")
+        with tmp_file.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(LABELS_FIELDS)
+            writer.writerows(labels.items())
+        os.replace(tmp_file, LABELS_FILE)
     else:
-        df = pd.concat([df, new_row], ignore_index=True)
+        # New label: append a single row. Line buffering hands it to the OS
+        # as soon as it is written
+        with LABELS_FILE.open("a", buffering=1, newline="", encoding="utf-8") as f:
+            csv.writer(f, lineterminator="\n").writerow([rel_str, label])
+        st.session_state["_labelled_set"].add(rel_str)
+
+    # The set already reflects this write, so don't rebuild it on the next load
+    stat = LABELS_FILE.stat()
+    st.session_state["_labelled_set_key"] = (stat.st_mtime_ns, stat.st_size)
 
-    df.to_csv(LABELS_FILE, index=False)
     logger.info(f"Saved label: {rel_path} -> {label}")
 
 
-def discover_images() -> list[Path]:
-    """Discover all images under data/raw/ recursively."""
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _discover_images_cached(signature: tuple) -> tuple[tuple[Path, str], ...]:
+    """
+    Walk data/raw/ for images; cached until the directory signature changes.
+
+    Cached as a shared resource rather than with st.cache_data, which would
+    unpickle a fresh copy of every Path on each rerun; the tuple is immutable.
+    """
     images = []
-    if not RAW_DATA_DIR.exists():
+
+    # Walk the tree once, only building Paths for files with an image suffix
+    for dirpath, _, filenames in os.walk(RAW_DATA_DIR):
+        for filename in filenames:
+            if os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS:
+                images.append(Path(dirpath) / filename)
+
+    # Pair each image with its project-relative path string (as stored in
+    # labels.csv) so reruns never recompute relative_to
+    return tuple((img_path, str(img_path.relative_to(PROJECT_ROOT))) for img_path in sorted(images))
+
+
+def _raw_dir_signature() -> tuple:
+    """
+    Cheap signature of data/raw/: the path and mtime of every directory in it.
+
+    Only directories are stat-ed, never individual files.
+    """
+    try:
+        signature = [(str(RAW_DATA_DIR), RAW_DATA_DIR.stat().st_mtime_ns)]
+    except FileNotFoundError:
+        # First run, or removed while the app was running: create it empty
         RAW_DATA_DIR.mkdir(parents=True, exist_ok=True)
-        return images
+        return ()
 
-    for ext in IMAGE_EXTENSIONS:
-        images.extend(RAW_DATA_DIR.rglob(f"*{ext}"))
+    pending_dirs = [str(RAW_DATA_DIR)]
+    while pending_dirs:
+        try:
+            with os.scandir(pending_dirs.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        signature.append((entry.path, entry.stat(follow_symlinks=False).st_mtime_ns))
+                        pending_dirs.append(entry.path)
+        except FileNotFoundError:
+            # Removed mid-scan; its parent's mtime already reflects that
+            continue
+
+    return tuple(sorted(signature))
+
+
+def discover_images(signature: tuple | None = None) -> tuple[tuple[Path, str], ...]:
+    """
+    Discover all images under data/raw/ recursively.
+
+    Args:
+        signature: _raw_dir_signature() result, if the caller already has one
+
+    Returns:
+        Sorted (absolute path, path relative to the project root) pairs
+    """
+    # Adding, removing or renaming a file changes its folder's mtime, so the
+    # walk only reruns when some directory in the tree has changed
+    if signature is None:
+        signature = _raw_dir_signature()
+    return _discover_images_cached(signature)
+
+
+def get_unlabelled_images(all_images: tuple[tuple[Path, str], ...] | None = None) -> list[Path]:
+    """
+    Get list of images that haven't been labelled yet.
+
+    Args:
+        all_images: discover_images() result, if the caller already has one
+    """
+    if all_images is None:
+        all_images = discover_images()
+    load_labels()
+    labelled = st.session_state["_labelled_set"]
 
-    return sorted(images)
+    # Common cases first: nothing to label, nothing labelled, everything labelled
+    if not all_images:
+        return []
+    if not labelled:
+        return [img_path for img_path, _ in all_images]
+    if labelled.issuperset(rel_str for _, rel_str in all_images):
+        return []
 
+    # Set lookups against the labelled paths
+    return [img_path for img_path, rel_str in all_images if rel_str not in labelled]
 
-def get_unlabelled_images() -> list[Path]:
-    """Get list of images that haven't been labelled yet."""
-    all_images = discover_images()
-    df = load_labels()
 
-    if df.empty or "image_path" not in df.columns:
-        return all_images
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _load_image_bytes(path: str, mtime_ns: int) -> bytes:
+    """
+    Read an image file; cached per (path, mtime) so reruns skip the disk read.
 
-    labelled_paths = set(df["image_path"].astype(str))
+    bytes are immutable, so the cached object is shared instead of copied.
+    """
+    return Path(path).read_bytes()
 
-    unlabelled = []
-    for img_path in all_images:
-        try:
-            rel_path = img_path.relative_to(PROJECT_ROOT)
-        except ValueError:
-            rel_path = img_path
 
-        if str(rel_path) not in labelled_paths:
-            unlabelled.append(img_path)
+def _get_unlabelled_for_session(
+    all_images: tuple[tuple[Path, str], ...], raw_signature: tuple
+) -> tuple[list[Path], dict[Path, int]]:
+    """
+    Return the unlabelled images and a {path: position} index into them.
+
+    Both are kept in session state and reused across reruns.
 
-    return unlabelled
+    The list is only recomputed when labels.csv or data/raw/ has changed
+    since it was last stored, so reruns that don't save a label skip the
+    comparison against every labelled path.
+
+    Args:
+        all_images: discover_images() result for this rerun
+        raw_signature: The _raw_dir_signature() all_images was discovered with
+    """
+    # (mtime_ns, size) of labels.csv, recorded by load_labels/save_label
+    labels_key = st.session_state.get("_labelled_set_key")
+
+    if (
+        "_unlabelled" not in st.session_state
+        or st.session_state.get("_labels_key") != labels_key
+        or st.session_state.get("_raw_signature") != raw_signature
+    ):
+        unlabelled = get_unlabelled_images(all_images)
+        st.session_state["_unlabelled"] = unlabelled
+        st.session_state["_unlabelled_idx"] = {path: i for i, path in enumerate(unlabelled)}
+        st.session_state["_labels_key"] = labels_key
+        st.session_state["_raw_signature"] = raw_signature
+
+    return st.session_state["_unlabelled"], st.session_state["_unlabelled_idx"]
 
 
 def main():
@@ -108,29 +258,38 @@ def main():
     st.markdown("Label screenshots for the classifier lab")
 
     # Load labels
-    labels_df = load_labels()
+    labels = load_labels()
 
     # Sidebar
     with st.sidebar:
         st.header("📊 Summary")
 
-        all_images = discover_images()
-        unlabelled = get_unlabelled_images()
+        # Scan data/raw once per rerun and share the signature
+        raw_signature = _raw_dir_signature()
+        all_images = discover_images(raw_signature)
+        rel_paths = dict(all_images)
+        unlabelled, unlabelled_idx = _get_unlabelled_for_session(all_images, raw_signature)
 
         st.metric("Total Images", len(all_images))
         st.metric("Unlabelled", len(unlabelled))
         st.metric("Labelled", len(all_images) - len(unlabelled))
 
-        if not labels_df.empty and "true_label" in labels_df.columns:
+        if labels:
             st.subheader("Label Counts")
-            label_counts = labels_df["true_label"].value_counts()
-            for label, count in label_counts.items():
+            label_counts = Counter(label for label in labels.values() if label)
+            for label, count in label_counts.most_common():
                 st.write(f"**{label}**: {count}")
 
         # Image selector
         if all_images:
             st.subheader("Jump to Image")
-            image_options = [str(img.relative_to(PROJECT_ROOT)) for img in all_images]
+            # Filter text persists in session state across reruns; the selectbox
+            # is capped so large folders don't ship every path to the browser
+            query = st.text_input("Filter images", key="image_filter")
+            matches = [rel_str for _, rel_str in all_images if query in rel_str]
+            image_options = matches[:MAX_IMAGE_OPTIONS]
+            if len(matches) > MAX_IMAGE_OPTIONS:
+                st.caption(f"Showing {MAX_IMAGE_OPTIONS} of {len(matches)} images; filter to narrow down.")
             selected_image = st.selectbox(
                 "Select image to view/relabel",
                 options=[""] + image_options,
@@ -154,7 +313,7 @@ def main():
         if unlabelled:
             st.session_state["current_image"] = unlabelled[0]
         elif all_images:
-            st.session_state["current_image"] = all_images[0]
+            st.session_state["current_image"] = all_images[0][0]
         else:
             st.info("All images have been labelled!")
             return
@@ -162,13 +321,15 @@ def main():
     current_image = st.session_state["current_image"]
 
     # Check if current image is still unlabelled
-    if current_image not in unlabelled and current_image in all_images:
+    if current_image not in unlabelled_idx and current_image in rel_paths:
         st.info(f"Image already labelled. Use sidebar to jump to unlabelled images.")
 
     # Display image
     try:
-        st.image(str(current_image), use_container_width=True)
-        st.caption(f"**Path:** `{current_image.relative_to(PROJECT_ROOT)}`")
+        image_bytes = _load_image_bytes(str(current_image), current_image.stat().st_mtime_ns)
+        st.image(image_bytes, use_container_width=True)
+        rel_str = rel_paths.get(current_image) or current_image.relative_to(PROJECT_ROOT)
+        st.caption(f"**Path:** `{rel_str}`")
     except Exception as e:
         st.error(f"Error loading image: {e}")
         return
@@ -205,9 +366,8 @@ def main():
     with col5:
         if st.button("⏭️ Skip", use_container_width=True):
             # Move to next unlabelled image
-            unlabelled = get_unlabelled_images()
             if unlabelled:
-                current_idx = unlabelled.index(current_image) if current_image in unlabelled else 0
+                current_idx = unlabelled_idx.get(current_image, 0)
                 next_idx = (current_idx + 1) % len(unlabelled)
                 st.session_state["current_image"] = unlabelled[next_idx]
                 st.rerun()
@@ -217,8 +377,8 @@ def main():
     # Navigation
     if unlabelled:
         st.markdown("---")
-        unlabelled_idx = unlabelled.index(current_image) if current_image in unlabelled else 0
-        st.caption(f"Image {unlabelled_idx + 1} of {len(unlabelled)} unlabelled")
+        position = unlabelled_idx.get(current_image, 0)
+        st.caption(f"Image {position + 1} of {len(unlabelled)} unlabelled")
 
 
 if __name__ == "__main__":